@@ -6,14 +6,199 @@ Universidad del Norte
 
 import csv
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple, Set, Optional
 import heapq
 import folium
+from folium.plugins import FastMarkerCluster
+import numpy as np
+
+
+# Por debajo de esta cantidad de rutas, el costo fijo de crear arreglos de NumPy
+# supera al de calcular cada distancia con math
+MIN_RUTAS_VECTORIZADAS = 32
+# Tamaño mínimo de cada bloque de rutas procesado por un hilo
+RUTAS_POR_HILO = 1 << 16
+
+
+def _dijkstra_csr(indptr: np.ndarray, indices: np.ndarray, pesos: np.ndarray,
+                  origen: int, distancias: List[float], predecesores: List[int],
+                  destino: int = -1):
+    """
+    Núcleo de Dijkstra sobre el grafo en formato CSR (nodos identificados por enteros).
+    Solo usa arreglos y un heap de (distancia, id), sin diccionarios ni cadenas.
+    
+    Args:
+        indptr, indices, pesos: Grafo en formato CSR (ver GrafoAereo.construir_csr)
+        origen: Id del nodo origen
+        distancias: Arreglo de tamaño N inicializado en infinito; se llena in place
+        predecesores: Arreglo de tamaño N inicializado en -1; se llena in place
+        destino: Id del nodo destino; si es >= 0 la búsqueda termina al fijar su
+                 distancia y las de los demás nodos pueden quedar incompletas
+    """
+    distancias[origen] = 0.0
+    
+    # Heap de prioridad: (distancia, id_nodo)
+    heap = [(0.0, origen)]
+    # Marcas de visitado indexadas por id, en lugar de un conjunto
+    visitados = bytearray(len(distancias))
+    
+    while heap:
+        distancia_actual, nodo_actual = heapq.heappop(heap)
+        
+        # Si ya visitamos este nodo, continuar
+        if visitados[nodo_actual]:
+            continue
+        
+        visitados[nodo_actual] = 1
+        
+        # Al salir del heap la distancia del destino ya es definitiva
+        if nodo_actual == destino:
+            break
+        
+        # Los vecinos del nodo están en indices[indptr[nodo]:indptr[nodo + 1]]
+        inicio = indptr[nodo_actual]
+        fin = indptr[nodo_actual + 1]
+        for vecino, peso in zip(indices[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+            if visitados[vecino]:
+                continue
+            
+            nueva_distancia = distancia_actual + peso
+            
+            # Si encontramos un camino más corto, actualizamos
+            if nueva_distancia < distancias[vecino]:
+                distancias[vecino] = nueva_distancia
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(heap, (nueva_distancia, vecino))
+
+
+def _prim_csr(indptr: np.ndarray, indices: np.ndarray, pesos: np.ndarray,
+              nodos: List[int]) -> float:
+    """
+    Núcleo de Prim sobre el grafo en formato CSR, restringido a los ids de `nodos`.
+    Guarda en `clave` el mejor peso conocido para conectar cada nodo al árbol, así el
+    heap solo contiene entradas (clave, id) que mejoraron y nunca aristas repetidas.
+    
+    Returns:
+        Peso total del árbol de expansión mínima
+    """
+    n = len(indptr) - 1
+    en_componente = bytearray(n)
+    for nodo in nodos:
+        en_componente[nodo] = 1
+    
+    clave = [float('infinity')] * n
+    en_arbol = bytearray(n)
+    nodos_en_arbol = 0
+    peso_total = 0.0
+    
+    # Comenzar con el primer nodo de la componente
+    clave[nodos[0]] = 0.0
+    heap = [(0.0, nodos[0])]
+    
+    # Mientras no hayamos agregado todos los nodos
+    while nodos_en_arbol < len(nodos) and heap:
+        peso, nodo_actual = heapq.heappop(heap)
+        
+        # Entrada superada por una clave menor, o nodo ya en el árbol
+        if en_arbol[nodo_actual]:
+            continue
+        
+        # Agregar el nodo al árbol
+        en_arbol[nodo_actual] = 1
+        nodos_en_arbol += 1
+        peso_total += peso
+        
+        # Actualizar la clave de los vecinos que quedan fuera del árbol
+        inicio = indptr[nodo_actual]
+        fin = indptr[nodo_actual + 1]
+        for vecino, peso_arista in zip(indices[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+            if en_componente[vecino] and not en_arbol[vecino] and peso_arista < clave[vecino]:
+                clave[vecino] = peso_arista
+                heapq.heappush(heap, (peso_arista, vecino))
+    
+    return peso_total
+
+
+# Ancho (en km) de cada cubeta de la cola de Dial
+ANCHO_CUBETA_KM = 10.0
+# Máximo de cubetas circulares antes de volver al heap binario
+MAX_CUBETAS = 1 << 16
+
+
+def _dijkstra_dial_csr(indptr: np.ndarray, indices: np.ndarray, pesos: np.ndarray,
+                       origen: int, distancias: List[float], predecesores: List[int],
+                       destino: int = -1):
+    """
+    Variante de Dijkstra con cola de cubetas (Dial) sobre el grafo en formato CSR.
+    Cada distancia tentativa d va a la cubeta int(d // ANCHO_CUBETA_KM), que se
+    recorren en orden; las distancias exactas se guardan aparte en `distancias`.
+    Un nodo puede procesarse más de una vez si mejora dentro de su misma cubeta,
+    por lo que el resultado es exacto aunque los pesos no sean múltiplos del ancho.
+    
+    Si el peso máximo requiere más de MAX_CUBETAS cubetas, usa _dijkstra_csr.
+    Los argumentos son los mismos que en _dijkstra_csr. Con destino, la búsqueda
+    termina al vaciar la cubeta que contiene su distancia, que ya no puede mejorar.
+    """
+    if len(pesos) == 0:
+        distancias[origen] = 0.0
+        return
+    
+    # Con un anillo de (peso_max / ancho) + 2 cubetas ninguna inserción
+    # alcanza a la cubeta que se está procesando
+    num_cubetas = int(float(pesos.max()) // ANCHO_CUBETA_KM) + 2
+    if num_cubetas > MAX_CUBETAS:
+        _dijkstra_csr(indptr, indices, pesos, origen, distancias, predecesores, destino)
+        return
+    
+    distancias[origen] = 0.0
+    
+    # Cubetas circulares con entradas (distancia, id_nodo)
+    cubetas = [[] for _ in range(num_cubetas)]
+    cubetas[0].append((0.0, origen))
+    pendientes = 1
+    cubeta_actual = 0
+    
+    while pendientes:
+        cubeta = cubetas[cubeta_actual % num_cubetas]
+        
+        while cubeta:
+            distancia_actual, nodo_actual = cubeta.pop()
+            pendientes -= 1
+            
+            # Entrada obsoleta: el nodo ya se mejoró después de insertarla
+            if distancia_actual > distancias[nodo_actual]:
+                continue
+            
+            inicio = indptr[nodo_actual]
+            fin = indptr[nodo_actual + 1]
+            for vecino, peso in zip(indices[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+                nueva_distancia = distancia_actual + peso
+                
+                # Si encontramos un camino más corto, actualizamos
+                if nueva_distancia < distancias[vecino]:
+                    distancias[vecino] = nueva_distancia
+                    predecesores[vecino] = nodo_actual
+                    cubetas[int(nueva_distancia // ANCHO_CUBETA_KM) % num_cubetas].append(
+                        (nueva_distancia, vecino))
+                    pendientes += 1
+        
+        # Toda mejora pendiente cae en cubetas posteriores: el destino ya es definitivo
+        if (destino >= 0 and distancias[destino] != float('infinity')
+                and int(distancias[destino] // ANCHO_CUBETA_KM) <= cubeta_actual):
+            break
+        
+        cubeta_actual += 1
 
 
 class Aeropuerto:
     """Clase que representa un aeropuerto con su información geográfica"""
     
+    # Atributos fijos: sin __dict__ por instancia
+    __slots__ = ('codigo', 'nombre', 'ciudad', 'pais', 'latitud', 'longitud',
+                 'latitud_rad', 'longitud_rad', 'cos_latitud')
+    
     def __init__(self, codigo: str, nombre: str, ciudad: str, pais: str, 
                  latitud: float, longitud: float):
         self.codigo = codigo
@@ -22,6 +207,10 @@ class Aeropuerto:
         self.pais = pais
         self.latitud = latitud
         self.longitud = longitud
+        # Valores trigonométricos precalculados para la fórmula de Haversine
+        self.latitud_rad = math.radians(latitud)
+        self.longitud_rad = math.radians(longitud)
+        self.cos_latitud = math.cos(self.latitud_rad)
     
     def __str__(self):
         return (f"Código: {self.codigo}\n"
@@ -44,8 +233,20 @@ class GrafoAereo:
     def __init__(self):
         # Diccionario de aeropuertos: codigo -> Aeropuerto
         self.aeropuertos: Dict[str, Aeropuerto] = {}
-        # Lista de adyacencia: codigo -> [(codigo_vecino, distancia)]
-        self.adyacencias: Dict[str, List[Tuple[str, float]]] = {}
+        # Adyacencias: codigo -> {codigo_vecino: distancia}
+        self.adyacencias: Dict[str, Dict[str, float]] = {}
+        # Estructura de arreglos: el aeropuerto con id i está en la posición i de cada lista
+        self._codigos: List[str] = []
+        self._latitudes: List[float] = []
+        self._longitudes: List[float] = []
+        self._ids: Dict[str, int] = {}
+        # Cachés derivadas de la estructura del grafo; se invalidan al modificarlo
+        self._csr_cache: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                        List[str], Dict[str, int]]] = None
+        self._conexo_cache: Optional[Tuple[bool, int, List[List[str]]]] = None
+        self._coordenadas_cache: Optional[np.ndarray] = None
+        # Resultados de Dijkstra por id de origen: (distancias, predecesores)
+        self._caminos_cache: Dict[int, Tuple[List[float], List[int]]] = {}
     
     @staticmethod
     def calcular_distancia_haversine(lat1: float, lon1: float, 
@@ -65,26 +266,121 @@ class GrafoAereo:
         
         # Convertir grados a radianes
         lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
         lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
         
         # Diferencias
         dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+        dlon = math.radians(lon2 - lon1)
         
-        # Fórmula de Haversine
-        a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        # Fórmula de Haversine: un seno por diferencia y un coseno por latitud
+        sin_dlat = math.sin(dlat / 2)
+        sin_dlon = math.sin(dlon / 2)
+        a = sin_dlat * sin_dlat + math.cos(lat1_rad) * math.cos(lat2_rad) * sin_dlon * sin_dlon
+        
+        # 2*atan2(sqrt(a), sqrt(1-a)) == 2*asin(sqrt(a)): una raíz y un atan2 menos
+        c = 2 * math.asin(math.sqrt(min(a, 1.0)))
         
         distancia = R * c
         return distancia
     
+    @staticmethod
+    def calcular_distancia_aeropuertos(origen: Aeropuerto, destino: Aeropuerto) -> float:
+        """
+        Calcula la distancia de Haversine entre dos aeropuertos usando los radianes
+        y cosenos precalculados en cada uno, sin recalcularlos por cada ruta.
+        
+        Returns:
+            Distancia en kilómetros
+        """
+        # Radio de la Tierra en kilómetros
+        R = 6371.0
+        
+        sin_dlat = math.sin((destino.latitud_rad - origen.latitud_rad) / 2)
+        sin_dlon = math.sin((destino.longitud_rad - origen.longitud_rad) / 2)
+        a = sin_dlat * sin_dlat + origen.cos_latitud * destino.cos_latitud * sin_dlon * sin_dlon
+        
+        return R * 2 * math.asin(math.sqrt(min(a, 1.0)))
+    
+    @staticmethod
+    def calcular_distancias_haversine_vector(lat1: np.ndarray, lon1: np.ndarray,
+                                             lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de la fórmula de Haversine sobre arreglos de NumPy.
+        Calcula todas las distancias en una sola pasada, sin bucles de Python.
+        
+        Args:
+            lat1, lon1: Arreglos con las coordenadas de los puntos de origen
+            lat2, lon2: Arreglos con las coordenadas de los puntos de destino
+        
+        Returns:
+            Arreglo con las distancias en kilómetros
+        """
+        # Radio de la Tierra en kilómetros
+        R = 6371.0
+        
+        # Convertir grados a radianes
+        lat1_rad = np.radians(lat1)
+        lat2_rad = np.radians(lat2)
+        
+        # Diferencias
+        dlat = lat2_rad - lat1_rad
+        dlon = np.radians(lon2 - lon1)
+        
+        # Fórmula de Haversine: un seno por diferencia y un coseno por latitud
+        sin_dlat = np.sin(dlat / 2)
+        sin_dlon = np.sin(dlon / 2)
+        a = sin_dlat * sin_dlat + np.cos(lat1_rad) * np.cos(lat2_rad) * sin_dlon * sin_dlon
+        
+        # 2*atan2(sqrt(a), sqrt(1-a)) == 2*arcsin(sqrt(a))
+        c = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+        
+        return R * c
+    
+    @staticmethod
+    def calcular_distancias_haversine_paralelo(lat1: np.ndarray, lon1: np.ndarray,
+                                               lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+        """
+        Divide los arreglos en bloques y calcula cada bloque con
+        calcular_distancias_haversine_vector en un hilo distinto. Las funciones
+        universales de NumPy liberan el GIL, así que los bloques corren en paralelo.
+        
+        Args:
+            lat1, lon1: Arreglos con las coordenadas de los puntos de origen
+            lat2, lon2: Arreglos con las coordenadas de los puntos de destino
+        
+        Returns:
+            Arreglo con las distancias en kilómetros
+        """
+        n = len(lat1)
+        num_hilos = min(os.cpu_count() or 1, -(-n // RUTAS_POR_HILO))
+        if num_hilos <= 1:
+            return GrafoAereo.calcular_distancias_haversine_vector(lat1, lon1, lat2, lon2)
+        
+        distancias = np.empty(n, dtype=np.float64)
+        tam_bloque = -(-n // num_hilos)
+        
+        def calcular_bloque(inicio: int):
+            bloque = slice(inicio, inicio + tam_bloque)
+            distancias[bloque] = GrafoAereo.calcular_distancias_haversine_vector(
+                lat1[bloque], lon1[bloque], lat2[bloque], lon2[bloque]
+            )
+        
+        with ThreadPoolExecutor(max_workers=num_hilos) as ejecutor:
+            # list() para esperar todos los bloques y propagar cualquier excepción
+            list(ejecutor.map(calcular_bloque, range(0, n, tam_bloque)))
+        
+        return distancias
+    
     def agregar_aeropuerto(self, aeropuerto: Aeropuerto):
         """Agrega un aeropuerto al grafo"""
         if aeropuerto.codigo not in self.aeropuertos:
             self.aeropuertos[aeropuerto.codigo] = aeropuerto
-            self.adyacencias[aeropuerto.codigo] = []
+            self.adyacencias[aeropuerto.codigo] = {}
+            self._ids[aeropuerto.codigo] = len(self._codigos)
+            self._codigos.append(aeropuerto.codigo)
+            self._latitudes.append(aeropuerto.latitud)
+            self._longitudes.append(aeropuerto.longitud)
+            self._invalidar_caches()
     
     def agregar_ruta(self, codigo_origen: str, codigo_destino: str):
         """
@@ -95,18 +391,24 @@ class GrafoAereo:
             origen = self.aeropuertos[codigo_origen]
             destino = self.aeropuertos[codigo_destino]
             
-            distancia = self.calcular_distancia_haversine(
-                origen.latitud, origen.longitud,
-                destino.latitud, destino.longitud
-            )
+            distancia = self.calcular_distancia_aeropuertos(origen, destino)
             
-            # Grafo no dirigido: agregar en ambas direcciones
-            # Verificar que no exista ya la arista
-            if not any(vecino == codigo_destino for vecino, _ in self.adyacencias[codigo_origen]):
-                self.adyacencias[codigo_origen].append((codigo_destino, distancia))
-            
-            if not any(vecino == codigo_origen for vecino, _ in self.adyacencias[codigo_destino]):
-                self.adyacencias[codigo_destino].append((codigo_origen, distancia))
+            self._agregar_arista(codigo_origen, codigo_destino, distancia)
+    
+    def _agregar_arista(self, codigo_origen: str, codigo_destino: str, distancia: float):
+        """Inserta la arista con su distancia ya calculada en ambas direcciones"""
+        # Grafo no dirigido: agregar en ambas direcciones
+        # setdefault conserva la arista si ya existía
+        self.adyacencias[codigo_origen].setdefault(codigo_destino, distancia)
+        self.adyacencias[codigo_destino].setdefault(codigo_origen, distancia)
+        self._invalidar_caches()
+    
+    def _invalidar_caches(self):
+        """Descarta las estructuras derivadas tras un cambio en el grafo"""
+        self._csr_cache = None
+        self._conexo_cache = None
+        self._coordenadas_cache = None
+        self._caminos_cache = {}
     
     def cargar_desde_csv(self, ruta_csv: str):
         """
@@ -115,42 +417,118 @@ class GrafoAereo:
         Args:
             ruta_csv: Ruta al archivo flights_final.csv
         """
-        aeropuertos_vistos = set()
-        
-        with open(ruta_csv, 'r', encoding='utf-8') as archivo:
-            lector = csv.DictReader(archivo)
+        # Rutas como pares de ids; las distancias se calculan al final en lote
+        ids_origen: List[int] = []
+        ids_destino: List[int] = []
+        
+        def registrar_aeropuerto(fila: List[str], columnas: Tuple[int, ...]) -> int:
+            """Crea el aeropuerto la primera vez que aparece y retorna su id"""
+            col_codigo, col_nombre, col_ciudad, col_pais, col_lat, col_lon = columnas
+            codigo = fila[col_codigo].strip()
+            if codigo not in self._ids:
+                self.agregar_aeropuerto(Aeropuerto(
+                    codigo=codigo,
+                    nombre=fila[col_nombre].strip(),
+                    ciudad=fila[col_ciudad].strip(),
+                    pais=fila[col_pais].strip(),
+                    latitud=float(fila[col_lat]),
+                    longitud=float(fila[col_lon])
+                ))
+            return self._ids[codigo]
+        
+        with open(ruta_csv, 'r', encoding='utf-8', newline='') as archivo:
+            # csv.reader entrega listas: se evita construir un dict por fila
+            lector = csv.reader(archivo)
+            encabezado = next(lector, None)
+            if encabezado is None:
+                return
+            
+            # Posición de cada columna, resuelta una sola vez
+            columna = {nombre: i for i, nombre in enumerate(encabezado)}
+            campos = ('Code', 'Name', 'City', 'Country', 'Latitude', 'Longitude')
+            columnas_origen = tuple(columna[f'Source Airport {campo}'] for campo in campos)
+            columnas_destino = tuple(columna[f'Destination Airport {campo}'] for campo in campos)
             
             for fila in lector:
-                # Agregar aeropuerto origen
-                codigo_origen = fila['Source Airport Code'].strip()
-                if codigo_origen not in aeropuertos_vistos:
-                    aeropuerto_origen = Aeropuerto(
-                        codigo=codigo_origen,
-                        nombre=fila['Source Airport Name'].strip(),
-                        ciudad=fila['Source Airport City'].strip(),
-                        pais=fila['Source Airport Country'].strip(),
-                        latitud=float(fila['Source Airport Latitude']),
-                        longitud=float(fila['Source Airport Longitude'])
-                    )
-                    self.agregar_aeropuerto(aeropuerto_origen)
-                    aeropuertos_vistos.add(codigo_origen)
-                
-                # Agregar aeropuerto destino
-                codigo_destino = fila['Destination Airport Code'].strip()
-                if codigo_destino not in aeropuertos_vistos:
-                    aeropuerto_destino = Aeropuerto(
-                        codigo=codigo_destino,
-                        nombre=fila['Destination Airport Name'].strip(),
-                        ciudad=fila['Destination Airport City'].strip(),
-                        pais=fila['Destination Airport Country'].strip(),
-                        latitud=float(fila['Destination Airport Latitude']),
-                        longitud=float(fila['Destination Airport Longitude'])
-                    )
-                    self.agregar_aeropuerto(aeropuerto_destino)
-                    aeropuertos_vistos.add(codigo_destino)
-                
-                # Agregar la ruta
-                self.agregar_ruta(codigo_origen, codigo_destino)
+                if not fila:
+                    continue
+                ids_origen.append(registrar_aeropuerto(fila, columnas_origen))
+                ids_destino.append(registrar_aeropuerto(fila, columnas_destino))
+        
+        if not ids_origen:
+            return
+        
+        codigos = self._codigos
+        
+        if len(ids_origen) < MIN_RUTAS_VECTORIZADAS:
+            # Pocas rutas: fórmula escalar con los valores precalculados de cada aeropuerto
+            aeropuertos = [self.aeropuertos[codigo] for codigo in codigos]
+            distancias = [self.calcular_distancia_aeropuertos(aeropuertos[i], aeropuertos[j])
+                          for i, j in zip(ids_origen, ids_destino)]
+        else:
+            # Coordenadas de cada ruta obtenidas por indexación de los arreglos de aeropuertos
+            lat = np.array(self._latitudes, dtype=np.float64)
+            lon = np.array(self._longitudes, dtype=np.float64)
+            origen = np.array(ids_origen, dtype=np.intp)
+            destino = np.array(ids_destino, dtype=np.intp)
+            distancias = self.calcular_distancias_haversine_paralelo(
+                lat[origen], lon[origen], lat[destino], lon[destino]
+            ).tolist()
+        
+        # Agregar las rutas con sus distancias ya calculadas
+        for i, j, distancia in zip(ids_origen, ids_destino, distancias):
+            # Grafo no dirigido: setdefault conserva la arista si ya existía
+            self.adyacencias[codigos[i]].setdefault(codigos[j], distancia)
+            self.adyacencias[codigos[j]].setdefault(codigos[i], distancia)
+        self._invalidar_caches()
+    
+    def construir_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Dict[str, int]]:
+        """
+        Construye la representación CSR (Compressed Sparse Row) del grafo.
+        Los vecinos del nodo i son indices[indptr[i]:indptr[i + 1]] con sus pesos
+        en la misma posición de `pesos`. Los pesos se guardan en float32 (precisión
+        de centímetros a 10.000 km) para reducir a la mitad la memoria recorrida;
+        las distancias acumuladas de los algoritmos siguen en float64.
+        
+        Returns:
+            (indptr, indices, pesos, id_a_codigo, codigo_a_id)
+        """
+        # Los ids son los del registro de aeropuertos (orden de inserción)
+        id_a_codigo = self._codigos
+        codigo_a_id = self._ids
+        
+        grados = [len(self.adyacencias[codigo]) for codigo in id_a_codigo]
+        indptr = np.zeros(len(id_a_codigo) + 1, dtype=np.int32)
+        np.cumsum(grados, out=indptr[1:])
+        
+        indices = np.fromiter(
+            (codigo_a_id[vecino] for codigo in id_a_codigo for vecino in self.adyacencias[codigo]),
+            dtype=np.int32, count=int(indptr[-1])
+        )
+        pesos = np.fromiter(
+            (peso for codigo in id_a_codigo for peso in self.adyacencias[codigo].values()),
+            dtype=np.float32, count=int(indptr[-1])
+        )
+        
+        return indptr, indices, pesos, id_a_codigo, codigo_a_id
+    
+    def _csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Dict[str, int]]:
+        """Retorna la representación CSR del grafo, construyéndola solo si cambió"""
+        if self._csr_cache is None:
+            self._csr_cache = self.construir_csr()
+        return self._csr_cache
+    
+    def _coordenadas(self) -> np.ndarray:
+        """
+        Retorna un arreglo (N, 2) con [latitud, longitud] de cada aeropuerto,
+        en el mismo orden de ids que la representación CSR.
+        """
+        if self._coordenadas_cache is None:
+            self._coordenadas_cache = np.column_stack(
+                (np.array(self._latitudes, dtype=np.float64),
+                 np.array(self._longitudes, dtype=np.float64))
+            )
+        return self._coordenadas_cache
     
     def es_conexo(self) -> Tuple[bool, int, List[List[str]]]:
         """
@@ -163,29 +541,38 @@ class GrafoAereo:
         if not self.aeropuertos:
             return True, 0, []
         
-        visitados = set()
-        componentes = []
+        # El resultado no cambia mientras no se modifique el grafo
+        if self._conexo_cache is not None:
+            return self._conexo_cache
         
-        def dfs(nodo: str, componente_actual: List[str]):
-            """DFS recursivo para encontrar componentes"""
-            visitados.add(nodo)
-            componente_actual.append(nodo)
-            
-            for vecino, _ in self.adyacencias[nodo]:
-                if vecino not in visitados:
-                    dfs(vecino, componente_actual)
+        indptr, indices, _, id_a_codigo, _ = self._csr()
+        n = len(id_a_codigo)
+        visitados = bytearray(n)
+        componentes = []
         
         # Encontrar todas las componentes conexas
-        for aeropuerto in self.aeropuertos:
-            if aeropuerto not in visitados:
-                componente_actual = []
-                dfs(aeropuerto, componente_actual)
-                componentes.append(componente_actual)
+        for raiz in range(n):
+            if not visitados[raiz]:
+                # DFS iterativo con pila explícita (evita RecursionError en componentes grandes)
+                visitados[raiz] = 1
+                componente_actual = [raiz]
+                pila = [raiz]
+                
+                while pila:
+                    nodo = pila.pop()
+                    for vecino in indices[indptr[nodo]:indptr[nodo + 1]].tolist():
+                        if not visitados[vecino]:
+                            visitados[vecino] = 1
+                            componente_actual.append(vecino)
+                            pila.append(vecino)
+                
+                componentes.append([id_a_codigo[i] for i in componente_actual])
         
         num_componentes = len(componentes)
         es_conexo = num_componentes == 1
         
-        return es_conexo, num_componentes, componentes
+        self._conexo_cache = (es_conexo, num_componentes, componentes)
+        return self._conexo_cache
     
     def arbol_expansion_minima_prim(self, componente: List[str] = None) -> float:
         """
@@ -205,85 +592,59 @@ class GrafoAereo:
         if not componente:
             return 0.0
         
-        # Conjunto de nodos en el árbol
-        en_arbol = set()
-        # Heap de aristas: (peso, nodo_en_arbol, nodo_fuera_arbol)
-        heap_aristas = []
-        peso_total = 0.0
-        
-        # Comenzar con el primer nodo de la componente
-        nodo_inicial = componente[0]
-        en_arbol.add(nodo_inicial)
-        
-        # Agregar todas las aristas del nodo inicial al heap
-        for vecino, peso in self.adyacencias[nodo_inicial]:
-            if vecino in componente:
-                heapq.heappush(heap_aristas, (peso, nodo_inicial, vecino))
-        
-        # Mientras no hayamos agregado todos los nodos
-        while len(en_arbol) < len(componente) and heap_aristas:
-            peso, nodo_en_arbol, nodo_fuera = heapq.heappop(heap_aristas)
-            
-            # Si el nodo ya está en el árbol, ignorar esta arista
-            if nodo_fuera in en_arbol:
-                continue
-            
-            # Agregar el nodo al árbol
-            en_arbol.add(nodo_fuera)
-            peso_total += peso
-            
-            # Agregar todas las aristas del nuevo nodo al heap
-            for vecino, peso_arista in self.adyacencias[nodo_fuera]:
-                if vecino in componente and vecino not in en_arbol:
-                    heapq.heappush(heap_aristas, (peso_arista, nodo_fuera, vecino))
+        indptr, indices, pesos, _, codigo_a_id = self._csr()
         
-        return peso_total
+        return _prim_csr(indptr, indices, pesos, [codigo_a_id[codigo] for codigo in componente])
     
-    def dijkstra(self, origen: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    def dijkstra(self, origen: str, 
+                 destino: Optional[str] = None) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
         """
         Implementación del algoritmo de Dijkstra para encontrar caminos mínimos.
         Implementación propia sin usar librerías externas.
         
         Args:
             origen: Código del aeropuerto origen
+            destino: Código del aeropuerto destino (opcional). Si se indica, la búsqueda
+                     termina en cuanto su distancia es definitiva; las distancias y
+                     predecesores de los demás aeropuertos pueden quedar incompletos.
         
         Returns:
             (distancias, predecesores)
             - distancias: dict con la distancia mínima desde el origen a cada nodo
             - predecesores: dict con el predecesor de cada nodo en el camino mínimo
         """
-        # Inicializar distancias con infinito
-        distancias = {aeropuerto: float('infinity') for aeropuerto in self.aeropuertos}
-        distancias[origen] = 0.0
+        _, _, _, id_a_codigo, codigo_a_id = self._csr()
+        id_destino = codigo_a_id[destino] if destino is not None else -1
+        distancias_id, predecesores_id = self._caminos_minimos(codigo_a_id[origen], id_destino)
         
-        # Predecesores para reconstruir el camino
-        predecesores = {aeropuerto: None for aeropuerto in self.aeropuertos}
+        # Traducir los ids de vuelta a códigos de aeropuerto
+        distancias = dict(zip(id_a_codigo, distancias_id))
+        predecesores = {codigo: (id_a_codigo[p] if p >= 0 else None)
+                        for codigo, p in zip(id_a_codigo, predecesores_id)}
         
-        # Heap de prioridad: (distancia, nodo)
-        heap = [(0.0, origen)]
-        visitados = set()
+        return distancias, predecesores
+    
+    def _caminos_minimos(self, origen: int, destino: int = -1) -> Tuple[List[float], List[int]]:
+        """
+        Retorna (distancias, predecesores) indexados por id desde el nodo `origen`.
+        El resultado se guarda por origen, así consultas sucesivas desde el mismo
+        aeropuerto (los más lejanos y luego un camino) ejecutan Dijkstra una sola vez.
+        Con `destino` >= 0 y sin resultado guardado, la búsqueda se corta al llegar
+        al destino; ese resultado parcial no se guarda.
+        """
+        if origen in self._caminos_cache:
+            return self._caminos_cache[origen]
         
-        while heap:
-            distancia_actual, nodo_actual = heapq.heappop(heap)
-            
-            # Si ya visitamos este nodo, continuar
-            if nodo_actual in visitados:
-                continue
-            
-            visitados.add(nodo_actual)
-            
-            # Revisar todos los vecinos
-            for vecino, peso in self.adyacencias[nodo_actual]:
-                if vecino in visitados:
-                    continue
-                
-                nueva_distancia = distancia_actual + peso
-                
-                # Si encontramos un camino más corto, actualizamos
-                if nueva_distancia < distancias[vecino]:
-                    distancias[vecino] = nueva_distancia
-                    predecesores[vecino] = nodo_actual
-                    heapq.heappush(heap, (nueva_distancia, vecino))
+        indptr, indices, pesos, id_a_codigo, _ = self._csr()
+        
+        # Inicializar distancias con infinito y predecesores con -1 (sin predecesor)
+        n = len(id_a_codigo)
+        distancias = [float('infinity')] * n
+        predecesores = [-1] * n
+        
+        _dijkstra_dial_csr(indptr, indices, pesos, origen, distancias, predecesores, destino)
+        if destino < 0:
+            self._caminos_cache[origen] = (distancias, predecesores)
         
         return distancias, predecesores
     
@@ -324,16 +685,28 @@ class GrafoAereo:
         Returns:
             Lista de tuplas (codigo_aeropuerto, distancia) ordenada de mayor a menor distancia
         """
-        distancias, _ = self.dijkstra(codigo_origen)
+        _, _, _, id_a_codigo, codigo_a_id = self._csr()
+        
+        # Usar Dijkstra directamente sobre los ids, sin pasar por los diccionarios
+        # indexados por código; el resultado queda guardado para dijkstra(codigo_origen)
+        origen = codigo_a_id[codigo_origen]
+        distancias, _ = self._caminos_minimos(origen)
+        
+        # Excluir el origen y los nodos no alcanzables (distancia infinita)
+        candidatas = np.array(distancias, dtype=np.float64)
+        candidatas[origen] = np.inf
+        alcanzables = np.isfinite(candidatas)
+        candidatas[~alcanzables] = -np.inf
         
-        # Filtrar las distancias infinitas (nodos no alcanzables)
-        distancias_alcanzables = [(codigo, dist) for codigo, dist in distancias.items() 
-                                  if dist != float('infinity') and codigo != codigo_origen]
+        k = min(cantidad, int(alcanzables.sum()))
+        if k <= 0:
+            return []
         
-        # Ordenar por distancia descendente
-        distancias_alcanzables.sort(key=lambda x: x[1], reverse=True)
+        # Selección parcial O(N) de los k mayores; solo esos k se ordenan
+        mayores = np.argpartition(-candidatas, k - 1)[:k]
+        mayores = mayores[np.argsort(-candidatas[mayores], kind='stable')]
         
-        return distancias_alcanzables[:cantidad]
+        return [(id_a_codigo[i], distancias[i]) for i in mayores.tolist()]
     
     def crear_mapa(self, ruta_salida: str = "mapa_aeropuertos.html"):
         """
@@ -343,20 +716,30 @@ class GrafoAereo:
             ruta_salida: Ruta donde se guardará el archivo HTML del mapa
         """
         # Calcular el centro del mapa (promedio de coordenadas)
-        lat_promedio = sum(a.latitud for a in self.aeropuertos.values()) / len(self.aeropuertos)
-        lon_promedio = sum(a.longitud for a in self.aeropuertos.values()) / len(self.aeropuertos)
+        lat_promedio, lon_promedio = self._coordenadas().mean(axis=0).tolist()
         
         # Crear el mapa
         mapa = folium.Map(location=[lat_promedio, lon_promedio], zoom_start=3)
         
-        # Agregar marcadores para cada aeropuerto
-        for aeropuerto in self.aeropuertos.values():
-            folium.Marker(
-                location=[aeropuerto.latitud, aeropuerto.longitud],
-                popup=f"{aeropuerto.codigo}: {aeropuerto.nombre}<br>{aeropuerto.ciudad}, {aeropuerto.pais}",
-                tooltip=aeropuerto.codigo,
-                icon=folium.Icon(color='blue', icon='plane', prefix='fa')
-            ).add_to(mapa)
+        # Agregar los aeropuertos como un único arreglo de datos agrupado en el navegador,
+        # en lugar de un folium.Marker (y su <script>) por aeropuerto.
+        # Cada fila: [latitud, longitud, popup, tooltip]
+        datos = [
+            [aeropuerto.latitud, aeropuerto.longitud,
+             f"{aeropuerto.codigo}: {aeropuerto.nombre}<br>{aeropuerto.ciudad}, {aeropuerto.pais}",
+             aeropuerto.codigo]
+            for aeropuerto in self.aeropuertos.values()
+        ]
+        crear_marcador = """
+            function (fila) {
+                var icono = L.AwesomeMarkers.icon({icon: 'plane', prefix: 'fa', markerColor: 'blue'});
+                var marcador = L.marker(new L.LatLng(fila[0], fila[1]), {icon: icono});
+                marcador.bindPopup(fila[2]);
+                marcador.bindTooltip(fila[3]);
+                return marcador;
+            }
+        """
+        FastMarkerCluster(datos, callback=crear_marcador).add_to(mapa)
         
         # Guardar el mapa
         mapa.save(ruta_salida)
@@ -376,15 +759,12 @@ class GrafoAereo:
             return
         
         # Obtener coordenadas del camino
-        coordenadas = []
-        for codigo in camino:
-            if codigo in self.aeropuertos:
-                aeropuerto = self.aeropuertos[codigo]
-                coordenadas.append([aeropuerto.latitud, aeropuerto.longitud])
+        codigo_a_id = self._csr()[4]
+        ids_camino = [codigo_a_id[codigo] for codigo in camino if codigo in codigo_a_id]
+        coordenadas = self._coordenadas()[ids_camino]
         
         # Calcular centro del mapa
-        lat_promedio = sum(coord[0] for coord in coordenadas) / len(coordenadas)
-        lon_promedio = sum(coord[1] for coord in coordenadas) / len(coordenadas)
+        lat_promedio, lon_promedio = coordenadas.mean(axis=0).tolist()
         
         # Crear el mapa
         mapa = folium.Map(location=[lat_promedio, lon_promedio], zoom_start=4)
@@ -398,11 +778,7 @@ class GrafoAereo:
             aeropuerto_destino = self.aeropuertos[codigo_destino]
             
             # Obtener la distancia entre estos dos aeropuertos
-            distancia = None
-            for vecino, peso in self.adyacencias[codigo_origen]:
-                if vecino == codigo_destino:
-                    distancia = peso
-                    break
+            distancia = self.adyacencias[codigo_origen].get(codigo_destino)
             
             # Coordenadas del segmento
             segmento_coords = [
@@ -552,7 +928,7 @@ def menu_principal():
                     print(f" Error: El aeropuerto '{codigo}' no existe en el sistema")
                 else:
                     # Calcular camino mínimo
-                    distancias, predecesores = grafo.dijkstra(primer_vertice)
+                    distancias, predecesores = grafo.dijkstra(primer_vertice, destino=codigo)
                     
                     if distancias[codigo] == float('infinity'):
                         print(f"\n No existe un camino entre {primer_vertice} y {codigo}")